@@ -1,4 +1,5 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
@@ -6,9 +7,27 @@ import time
 import json
 import re
 import graphviz
-import base64
+import gzip
+import hashlib
+import mimetypes
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+except ImportError:
+    PdfReader = None
+    PdfReadError = ValueError
+
 load_dotenv()
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
@@ -17,7 +36,11 @@ GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY not found in environment variables")
 
-genai.configure(api_key=GEMINI_API_KEY)
+# REST transport goes through plain sockets, which gevent can make
+# cooperative - gRPC would block the whole worker while waiting on Gemini
+GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT', 'rest')
+
+genai.configure(api_key=GEMINI_API_KEY, transport=GEMINI_TRANSPORT)
 
 model = None
 MODEL_NAME = None
@@ -73,32 +96,480 @@ Guidelines:
 
 Always be educational, thorough, and clear."""
 
+# Caps how many Gemini calls one worker process keeps in flight. Under the
+# gevent worker this semaphore is cooperative, so a waiting request costs a
+# greenlet rather than an OS thread.
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '200'))
+llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+
+def generate_content(prompt, generation_config=None):
+    """Call Gemini while holding one of the worker's LLM slots"""
+    with llm_slots:
+        return model.generate_content(prompt, generation_config=generation_config)
+
+
+# STATIC ASSETS AND PAGES
+
+# Static files are fingerprinted (style.<hash>.css) and precompressed once at
+# startup, so they can be cached forever. Pages are pre-rendered into memory
+# and revalidated by ETag, which picks up new asset hashes after a deploy.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PAGE_CACHE_CONTROL = 'no-cache'
+PAGE_TEMPLATES = ['index.html', 'summarize.html', 'quiz.html', 'flowchart.html']
+
+asset_names = {}      # original filename -> fingerprinted filename
+static_assets = {}    # fingerprinted filename -> precompressed asset
+rendered_pages = {}   # template name -> precompressed page
+
+
+def compress_variants(data):
+    """Return the identity, gzip and (if available) brotli encodings of data"""
+    variants = {None: data}
+
+    gzip_data = gzip.compress(data, 9, mtime=0)
+    if len(gzip_data) < len(data):
+        variants['gzip'] = gzip_data
+
+    if brotli:
+        brotli_data = brotli.compress(data, quality=11)
+        if len(brotli_data) < len(data):
+            variants['br'] = brotli_data
+
+    return variants
+
+
+def choose_encoding(available):
+    """Pick the best encoding the client accepts out of the available ones"""
+    for encoding in ('br', 'gzip'):
+        if encoding in available and request.accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def precompressed_response(variants, etag, mimetype, cache_control):
+    """Serve a precompressed body with ETag revalidation"""
+    encoding = choose_encoding(variants)
+    if encoding:
+        etag = f'{etag}-{encoding}'
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(variants[encoding], mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def load_static_assets():
+    """Fingerprint and precompress every file in the static folder"""
+    for root, _, files in os.walk(app.static_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            filename = os.path.relpath(path, app.static_folder).replace(os.sep, '/')
+
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            stem, ext = os.path.splitext(filename)
+            fingerprinted = f'{stem}.{digest}{ext}'
+
+            asset_names[filename] = fingerprinted
+            static_assets[fingerprinted] = {
+                'etag': digest,
+                'mimetype': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                'variants': compress_variants(data)
+            }
+
+    print(f"✅ Fingerprinted {len(static_assets)} static assets")
+
+
+def render_pages():
+    """Render every page once so requests are served from memory"""
+    with app.test_request_context():
+        for template in PAGE_TEMPLATES:
+            html = render_template(template).encode('utf-8')
+            rendered_pages[template] = {
+                'etag': hashlib.sha256(html).hexdigest()[:16],
+                'variants': compress_variants(html)
+            }
+
+    print(f"✅ Pre-rendered {len(rendered_pages)} pages")
+
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    """Make url_for('static', ...) point at the fingerprinted file"""
+    if endpoint == 'static' and values.get('filename') in asset_names:
+        values['filename'] = asset_names[values['filename']]
+
+
+def serve_static(filename):
+    """Serve fingerprinted assets from memory, anything else from disk"""
+    asset = static_assets.get(filename)
+    if not asset:
+        return app.send_static_file(filename)
+
+    return precompressed_response(
+        asset['variants'], asset['etag'], asset['mimetype'], IMMUTABLE_CACHE_CONTROL
+    )
+
+
+app.view_functions['static'] = serve_static
+
+
+def page_response(template):
+    page = rendered_pages.get(template)
+    if not page:
+        return render_template(template)
+
+    return precompressed_response(
+        page['variants'], page['etag'], 'text/html', PAGE_CACHE_CONTROL
+    )
+
 
 #routes
 
 @app.route('/')
 def index():
     """Homepage"""
-    return render_template('index.html')
+    return page_response('index.html')
 
 
 @app.route('/summarize')
 def summarize_page():
     """Summarizer page"""
-    return render_template('summarize.html')
+    return page_response('summarize.html')
 
 
 @app.route('/quiz')
 def quiz_page():
     """Quiz Generator page"""
-    return render_template('quiz.html')
+    return page_response('quiz.html')
 
 @app.route('/flowchart')
 def flowchart_page():
     """Flowchart Generator Page"""
-    return render_template('flowchart.html')
+    return page_response('flowchart.html')
+
+
+# API ENDPOINTS - document upload
+
+# Uploads are streamed to disk (werkzeug spools large multipart parts to a
+# temp file) and rejected up front when Content-Length is too big. Text is
+# extracted in a process pool and cached on disk by file hash, so every
+# tool can reuse it through 'document_id' instead of re-uploading.
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(20 * 1024 * 1024)))
+JSON_MAX_BYTES = int(os.getenv('JSON_MAX_BYTES', str(256 * 1024)))
+UPLOAD_EXTENSIONS = {'.txt', '.md', '.markdown', '.pdf'}
+UPLOAD_DIR = os.getenv(
+    'UPLOAD_DIR',
+    os.path.join(tempfile.gettempdir(), 'scholarai-uploads')
+)
+DOCUMENT_CACHE_MAX = int(os.getenv('DOCUMENT_CACHE_MAX', '1000'))
+# Per gunicorn worker - keep small, there is one pool in every worker process
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '2'))
+EXTRACTION_TIMEOUT = int(os.getenv('EXTRACTION_TIMEOUT', '120'))
+PDF_PAGES_PER_TASK = 20
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Tool -> (min chars, max chars) accepted as input text. Uploaded documents
+# longer than a tool's maximum are truncated to it when passed by document_id.
+TEXT_LIMITS = {
+    'summarize': (100, 30000),
+    'quiz': (100, 20000),
+    'flowchart': (50, 15000),
+}
+
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_BYTES
+
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Created lazily so that each gunicorn worker gets its own pool after the
+# fork instead of inheriting one from the preloading master
+extraction_pool = None
+extraction_pool_lock = threading.Lock()
+
+
+def get_extraction_pool():
+    global extraction_pool
+    with extraction_pool_lock:
+        if extraction_pool is None:
+            extraction_pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+    return extraction_pool
+
+
+def reset_extraction_pool(pool):
+    """Replace a crashed or stuck pool, killing its processes"""
+    global extraction_pool
+    with extraction_pool_lock:
+        if extraction_pool is pool:
+            extraction_pool = None
+
+    # shutdown() alone would leave a runaway task holding its slot, so kill
+    # the processes too (grabbed first - shutdown clears _processes)
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+
+
+def run_in_pool(tasks, deadline):
+    """Run (function, *args) tasks in the extraction pool and return their results
+
+    A crashed pool is replaced and the tasks retried once. Tasks still
+    running at the deadline are cancelled and their pool replaced.
+    """
+    for attempt in range(2):
+        pool = get_extraction_pool()
+        futures = []
+        try:
+            futures = [pool.submit(*task) for task in tasks]
+            return [f.result(timeout=max(0, deadline - time.monotonic())) for f in futures]
+        except BrokenProcessPool:
+            reset_extraction_pool(pool)
+            if attempt == 1:
+                raise
+            print("⚠️  Extraction pool crashed, retrying with a new pool...")
+        except FuturesTimeout:
+            for f in futures:
+                f.cancel()
+            reset_extraction_pool(pool)
+            raise
+
+
+def document_path(document_id):
+    return os.path.join(UPLOAD_DIR, f'{document_id}.txt')
+
+
+def extract_plain_text(path):
+    """Decode a text or Markdown file (runs in the extraction pool)"""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8-sig', errors='replace')
+
+
+def count_pdf_pages(path):
+    return len(PdfReader(path).pages)
+
+
+def extract_pdf_pages(path, start, stop):
+    """Extract text from a range of PDF pages (runs in the extraction pool)"""
+    reader = PdfReader(path)
+    return '\n\n'.join(reader.pages[i].extract_text() or '' for i in range(start, stop))
+
+
+def is_pdf_file(path):
+    with open(path, 'rb') as f:
+        return f.read(5) == b'%PDF-'
+
+
+def extract_document(path):
+    """Extract text from an uploaded file, splitting PDFs across the pool by page"""
+    deadline = time.monotonic() + EXTRACTION_TIMEOUT
+
+    if not is_pdf_file(path):
+        return run_in_pool([(extract_plain_text, path)], deadline)[0]
+
+    if PdfReader is None:
+        raise ValueError('PDF support is not installed on this server.')
+
+    page_count = run_in_pool([(count_pdf_pages, path)], deadline)[0]
+    tasks = [
+        (extract_pdf_pages, path, start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    return '\n\n'.join(run_in_pool(tasks, deadline))
+
+
+def save_upload(stream):
+    """Copy an upload to disk in chunks, returning (sha256, path)"""
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(UPLOAD_DIR, f'upload.{os.getpid()}.{threading.get_ident()}.tmp')
+
+    try:
+        with open(tmp_path, 'wb') as f:
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        # Don't leave a partial upload behind (e.g. disk full, client gone)
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return digest.hexdigest(), tmp_path
+
+
+def prune_documents():
+    """Drop the least recently used documents once past DOCUMENT_CACHE_MAX"""
+    entries = [e for e in os.scandir(UPLOAD_DIR) if e.name.endswith('.txt')]
+    if len(entries) <= DOCUMENT_CACHE_MAX:
+        return
+
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - DOCUMENT_CACHE_MAX]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def load_document(document_id):
+    """Return the extracted text of an uploaded document, or None"""
+    if not re.fullmatch(r'[0-9a-f]{64}', str(document_id)):
+        return None
+
+    data = read_artifact(document_path(document_id))
+    if data is None:
+        return None
+
+    touch_artifact(document_path(document_id))
+    return data.decode('utf-8')
 
 
+def request_text(data, tool):
+    """Return (text, truncated, error) for a JSON body with 'text' or 'document_id'
+
+    Documents longer than the tool's TEXT_LIMITS maximum are truncated to it;
+    inline text is returned as-is and length-checked by the route.
+    """
+    if not data:
+        return None, False, None
+
+    if data.get('document_id'):
+        text = load_document(data['document_id'])
+        if text is None:
+            return None, False, 'Document not found. Please upload it again.'
+
+        text = text.strip()
+        max_chars = TEXT_LIMITS[tool][1]
+        if len(text) > max_chars:
+            return text[:max_chars], True, None
+        return text, False, None
+
+    return data.get('text'), False, None
+
+
+@app.before_request
+def limit_json_body():
+    """Reject oversized JSON bodies before they are read into memory"""
+    if request.is_json and (request.content_length or 0) > JSON_MAX_BYTES:
+        return jsonify({
+            'error': 'Request is too large. Please upload long documents as a file instead.'
+        }), 413
+
+
+@app.route('/upload', methods=['POST'])
+def upload_document():
+    """Upload a text, Markdown or PDF file and extract its text"""
+    # Refuse before reading a single byte of the body when possible
+    if (request.content_length or 0) > UPLOAD_MAX_BYTES:
+        return too_large(None)
+    
+    tmp_path = None
+    try:
+        upload = request.files.get('file')
+        
+        if not upload or not upload.filename:
+            return jsonify({
+                'error': 'No file provided. Send it as multipart form field "file".'
+            }), 400
+        
+        ext = os.path.splitext(upload.filename)[1].lower()
+        if ext not in UPLOAD_EXTENSIONS:
+            return jsonify({
+                'error': 'Unsupported file type. Please upload a .txt, .md or .pdf file.'
+            }), 400
+        
+        document_id, tmp_path = save_upload(upload.stream)
+        
+        if is_pdf_file(tmp_path) != (ext == '.pdf'):
+            return jsonify({
+                'error': f'File contents do not match the {ext} extension.'
+            }), 400
+        
+        cached = read_artifact(document_path(document_id))
+        if cached is not None:
+            touch_artifact(document_path(document_id))
+            text = cached.decode('utf-8')
+            print(f"📄 Reusing extracted text for {upload.filename}")
+        else:
+            print(f"📄 Extracting text from {upload.filename}...")
+            text = extract_document(tmp_path)
+            write_artifact(document_path(document_id), text.encode('utf-8'))
+            prune_documents()
+            print(f"✅ Extracted {len(text)} chars")
+        
+        if not text.strip():
+            return jsonify({
+                'error': 'No text could be extracted from this file. Scanned PDFs are not supported.'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'document_id': document_id,
+            'filename': upload.filename,
+            'text_length': len(text),
+            'preview': text[:500],
+            # Which tools accept this document, and where it will be cut off
+            'tools': {
+                tool: {
+                    'min_chars': min_chars,
+                    'max_chars': max_chars,
+                    'accepted': len(text.strip()) >= min_chars,
+                    'truncated': len(text.strip()) > max_chars
+                }
+                for tool, (min_chars, max_chars) in TEXT_LIMITS.items()
+            }
+        }), 200
+        
+    except RequestEntityTooLarge:
+        # Chunked bodies without Content-Length are cut off while streaming
+        raise
+        
+    except FuturesTimeout:
+        print(f"⚠️  Extraction timed out after {EXTRACTION_TIMEOUT}s")
+        return jsonify({
+            'error': 'Reading this file took too long. Please try a smaller file.'
+        }), 504
+        
+    except BrokenProcessPool:
+        print(f"⚠️  Extraction crashed the pool twice")
+        return jsonify({
+            'error': 'This file could not be processed. It may be damaged or too complex.'
+        }), 400
+        
+    except (ValueError, PdfReadError) as e:
+        print(f"⚠️  Extraction error: {str(e)[:100]}")
+        return jsonify({
+            'error': f'Could not read this file: {str(e)[:100]}'
+        }), 400
+        
+    except Exception as e:
+        print(f"❌ Upload error: {str(e)[:100]}")
+        return jsonify({
+            'error': 'Upload failed. Please try again.'
+        }), 500
+        
+    finally:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+
 # API ENDPOINTS - summarizer
 
 @app.route('/summarize', methods=['POST'])
@@ -106,21 +577,27 @@ def summarize():
     """Handle summarization requests with Gemini API"""
     try:
         data = request.get_json()
+        text, truncated, document_error = request_text(data, 'summarize')
         
-        if not data or 'text' not in data:
+        if document_error:
+            return jsonify({
+                'answer': document_error
+            }), 404
+        
+        if text is None:
             return jsonify({
                 'answer': 'Error: No text provided for analysis.'
             }), 400
         
-        text = data['text'].strip()
+        text = text.strip()
         
         # Validate text length
-        if len(text) < 100:
+        if len(text) < TEXT_LIMITS['summarize'][0]:
             return jsonify({
                 'answer': 'Text is too short. Please provide at least 100 characters for meaningful analysis.'
             }), 400
         
-        if len(text) > 30000:
+        if len(text) > TEXT_LIMITS['summarize'][1]:
             return jsonify({
                 'answer': 'Text is too long. Please provide text under 30,000 characters to stay within quota limits.'
             }), 400
@@ -150,7 +627,7 @@ Provide your educational analysis:"""
         
         for attempt in range(max_retries):
             try:
-                response = model.generate_content(
+                response = generate_content(
                     prompt,
                     generation_config={
                         'temperature': 0.7,
@@ -164,7 +641,8 @@ Provide your educational analysis:"""
                     return jsonify({
                         'answer': response.text,
                         'model': MODEL_NAME.replace('models/', ''),
-                        'text_length': text_length
+                        'text_length': text_length,
+                        'truncated': truncated
                     }), 200
                     
             except Exception as e:
@@ -206,23 +684,29 @@ def generate_quiz():
     """Generate quiz questions from text using Gemini"""
     try:
         data = request.get_json()
+        text, truncated, document_error = request_text(data, 'quiz')
+        
+        if document_error:
+            return jsonify({
+                'error': document_error
+            }), 404
         
-        if not data or 'text' not in data:
+        if text is None:
             return jsonify({
                 'error': 'No text provided for quiz generation.'
             }), 400
         
-        text = data['text'].strip()
+        text = text.strip()
         num_questions = data.get('num_questions', 5)
         difficulty = data.get('difficulty', 'medium')
         
         # Validate inputs
-        if len(text) < 100:
+        if len(text) < TEXT_LIMITS['quiz'][0]:
             return jsonify({
                 'error': 'Text is too short. Please provide at least 100 characters.'
             }), 400
         
-        if len(text) > 20000:
+        if len(text) > TEXT_LIMITS['quiz'][1]:
             return jsonify({
                 'error': 'Text is too long. Please keep it under 20,000 characters.'
             }), 400
@@ -266,7 +750,7 @@ Generate {num_questions} questions now in pure JSON format:"""
         
         for attempt in range(max_retries):
             try:
-                response = model.generate_content(
+                response = generate_content(
                     prompt,
                     generation_config={
                         'temperature': 0.8,
@@ -313,7 +797,8 @@ Generate {num_questions} questions now in pure JSON format:"""
                     return jsonify({
                         'success': True,
                         'quiz': quiz_data,
-                        'num_questions': len(quiz_data['questions'])
+                        'num_questions': len(quiz_data['questions']),
+                        'truncated': truncated
                     }), 200
                     
                 except (json.JSONDecodeError, ValueError) as je:
@@ -327,7 +812,8 @@ Generate {num_questions} questions now in pure JSON format:"""
                     return jsonify({
                         'success': True,
                         'quiz_text': response.text,
-                        'note': 'Quiz generated but not in perfect JSON format. Please try again.'
+                        'note': 'Quiz generated but not in perfect JSON format. Please try again.',
+                        'truncated': truncated
                     }), 200
                     
             except Exception as e:
@@ -361,27 +847,162 @@ Generate {num_questions} questions now in pure JSON format:"""
 
 #FLOWCHART PART
 
+# Rendered flowcharts are stored on disk by content hash so every worker
+# process can serve them. The SVG is rendered (and precompressed) once when the
+# flowchart is generated, the PNG only when it is first requested.
+FLOWCHART_CACHE_DIR = os.getenv(
+    'FLOWCHART_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'scholarai-flowcharts')
+)
+FLOWCHART_CACHE_MAX = int(os.getenv('FLOWCHART_CACHE_MAX', '500'))
+
+# Content-Encoding -> file extension of the precompressed SVG variant
+SVG_ENCODINGS = {'br': 'svg.br', 'gzip': 'svg.gz'}
+
+os.makedirs(FLOWCHART_CACHE_DIR, exist_ok=True)
+
+
+def flowchart_path(artifact_hash, ext):
+    return os.path.join(FLOWCHART_CACHE_DIR, f'{artifact_hash}.{ext}')
+
+
+def write_artifact(path, data):
+    """Write a file atomically so readers never see a partial artifact"""
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def touch_artifact(path):
+    """Bump an artifact's mtime on use, so pruning by mtime evicts least recently used"""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def store_flowchart(dot_code, svg_data):
+    """Save a rendered flowchart and return its content hash"""
+    artifact_hash = hashlib.sha256(dot_code.encode('utf-8')).hexdigest()
+
+    if not os.path.exists(flowchart_path(artifact_hash, 'svg')):
+        write_artifact(flowchart_path(artifact_hash, 'dot'), dot_code.encode('utf-8'))
+        for encoding, data in compress_variants(svg_data).items():
+            if encoding:
+                write_artifact(flowchart_path(artifact_hash, SVG_ENCODINGS[encoding]), data)
+        # SVG is written last - its presence marks the artifact as complete
+        write_artifact(flowchart_path(artifact_hash, 'svg'), svg_data)
+        prune_flowcharts()
+    else:
+        touch_artifact(flowchart_path(artifact_hash, 'svg'))
+
+    return artifact_hash
+
+
+def prune_flowcharts():
+    """Drop the least recently used flowcharts once past FLOWCHART_CACHE_MAX"""
+    entries = [e for e in os.scandir(FLOWCHART_CACHE_DIR) if e.name.endswith('.svg')]
+    if len(entries) <= FLOWCHART_CACHE_MAX:
+        return
+
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - FLOWCHART_CACHE_MAX]:
+        artifact_hash = entry.name[:-len('.svg')]
+        for ext in ('svg', 'svg.gz', 'svg.br', 'png', 'dot'):
+            try:
+                os.remove(flowchart_path(artifact_hash, ext))
+            except FileNotFoundError:
+                pass
+
+
+@app.route('/flowchart/<artifact_hash>.<any(svg, png):fmt>')
+def flowchart_artifact(artifact_hash, fmt):
+    """Serve a rendered flowchart as SVG or PNG by content hash"""
+    if not re.fullmatch(r'[0-9a-f]{64}', artifact_hash) or \
+            not os.path.exists(flowchart_path(artifact_hash, 'svg')):
+        return jsonify({'error': 'Flowchart not found'}), 404
+
+    encoding = None
+    if fmt == 'svg':
+        encoding = choose_encoding([
+            encoding for encoding, ext in SVG_ENCODINGS.items()
+            if os.path.exists(flowchart_path(artifact_hash, ext))
+        ])
+    etag = f'{artifact_hash}-{fmt}' + (f'-{encoding}' if encoding else '')
+
+    # Artifacts never change for a given hash, so a matching ETag is enough
+    # to answer without touching the disk or rendering anything
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif fmt == 'svg':
+        touch_artifact(flowchart_path(artifact_hash, 'svg'))
+        data = read_artifact(flowchart_path(artifact_hash, SVG_ENCODINGS.get(encoding, 'svg')))
+        if data is None:
+            return jsonify({'error': 'Flowchart not found'}), 404
+        response = Response(data, mimetype='image/svg+xml')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    else:
+        touch_artifact(flowchart_path(artifact_hash, 'svg'))
+        png_data = read_artifact(flowchart_path(artifact_hash, 'png'))
+        if png_data is None:
+            dot_code = read_artifact(flowchart_path(artifact_hash, 'dot'))
+            if dot_code is None:
+                return jsonify({'error': 'Flowchart not found'}), 404
+            try:
+                png_data = graphviz.Source(dot_code.decode('utf-8')).pipe(format='png')
+            except Exception as e:
+                print(f"❌ PNG render error: {str(e)[:100]}")
+                return jsonify({
+                    'error': 'Could not render the PNG. Please try downloading the SVG instead.'
+                }), 500
+            write_artifact(flowchart_path(artifact_hash, 'png'), png_data)
+            print(f"✅ PNG rendered on first request ({len(png_data)} bytes)")
+        response = Response(png_data, mimetype='image/png')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    if fmt == 'svg':
+        response.vary.add('Accept-Encoding')
+    return response
+
+
 @app.route('/generate-flowchart', methods=['POST'])
 def generate_flowchart():
     """Generate flowchart from text using Gemini and Graphviz"""
     try:
         data = request.get_json()
+        text, truncated, document_error = request_text(data, 'flowchart')
         
-        if not data or 'text' not in data:
+        if document_error:
+            return jsonify({
+                'error': document_error
+            }), 404
+        
+        if text is None:
             return jsonify({
                 'error': 'No text provided for flowchart generation.'
             }), 400
         
-        text = data['text'].strip()
+        text = text.strip()
         chart_style = data.get('chart_style', 'TB')
         
         # Validate inputs
-        if len(text) < 50:
+        if len(text) < TEXT_LIMITS['flowchart'][0]:
             return jsonify({
                 'error': 'Text is too short. Please provide at least 50 characters describing the process.'
             }), 400
         
-        if len(text) > 15000:
+        if len(text) > TEXT_LIMITS['flowchart'][1]:
             return jsonify({
                 'error': 'Text is too long. Please keep it under 15,000 characters.'
             }), 400
@@ -431,7 +1052,7 @@ Generate the Graphviz DOT code:"""
             try:
                 print(f"Attempt {attempt + 1}/{max_retries}")
                 
-                response = model.generate_content(
+                response = generate_content(
                     prompt,
                     generation_config={
                         'temperature': 0.4,  
@@ -497,21 +1118,20 @@ Generate the Graphviz DOT code:"""
                     print("Attempting to render with Graphviz...")
                     graph = graphviz.Source(dot_code)
                     
-                    # Render to SVG
-                    svg_data = graph.pipe(format='svg').decode('utf-8')
+                    # Render to SVG only - the PNG is rendered lazily by flowchart_artifact
+                    svg_data = graph.pipe(format='svg')
                     print(f"✅ SVG rendered successfully ({len(svg_data)} bytes)")
                     
-                    # Render to PNG and convert to base64
-                    png_data = graph.pipe(format='png')
-                    png_base64 = base64.b64encode(png_data).decode('utf-8')
-                    print(f"✅ PNG rendered successfully")
+                    artifact_hash = store_flowchart(dot_code, svg_data)
                     
                     return jsonify({
                         'success': True,
                         'dot_code': dot_code,
-                        'svg_data': svg_data,
-                        'png_base64': png_base64,
-                        'chart_style': chart_style
+                        'flowchart_hash': artifact_hash,
+                        'svg_url': url_for('flowchart_artifact', artifact_hash=artifact_hash, fmt='svg'),
+                        'png_url': url_for('flowchart_artifact', artifact_hash=artifact_hash, fmt='png'),
+                        'chart_style': chart_style,
+                        'truncated': truncated
                     }), 200
                     
                 except Exception as render_error:
@@ -587,7 +1207,7 @@ Return ONLY valid DOT code:"""
 def health():
     """Health check endpoint"""
     try:
-        test_response = model.generate_content(
+        test_response = generate_content(
             "Test", 
             generation_config={'max_output_tokens': 10}
         )
@@ -607,7 +1227,7 @@ def health():
 def test_api():
     """Test API endpoint - uses minimal tokens"""
     try:
-        response = model.generate_content(
+        response = generate_content(
             "Say 'OK'",
             generation_config={'max_output_tokens': 10}
         )
@@ -635,10 +1255,29 @@ def not_found(e):
     return jsonify({'error': 'Route not found'}), 404
 
 
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({
+        'error': f'File is too large. Maximum upload size is {UPLOAD_MAX_BYTES // (1024 * 1024)} MB.'
+    }), 413
+
+
 @app.errorhandler(500)
 def internal_error(e):
     return jsonify({'error': 'Internal server error'}), 500
 
+# STARTUP
+
+# On by default; set SCHOLARAI_PRECOMPUTE_ASSETS=0 to serve templates and
+# static files straight from disk
+PRECOMPUTE_ASSETS = os.getenv('SCHOLARAI_PRECOMPUTE_ASSETS', '1').lower() not in ('0', 'false', 'no')
+
+if PRECOMPUTE_ASSETS:
+    load_static_assets()
+    render_pages()
+else:
+    print("⚠️  Static assets and pages are not precomputed")
+
 #main
 
 if __name__ == '__main__':
@@ -656,6 +1295,19 @@ if __name__ == '__main__':
     print("   - Homepage: http://localhost:5000")
     print("   - Flash models: ~1500 requests/day")
     print("   - If quota exceeded: Wait 24 hours or create new API key")
+    print("   - Production: gunicorn -c gunicorn.conf.py app:app")
     print("="*70 + "\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server only - use gunicorn.conf.py in production
+    # Same rule as Flask's own FLASK_DEBUG handling - off unless set
+    debug = os.getenv('FLASK_DEBUG', '').lower() not in ('', '0', 'false', 'no')
+    
+    # Assets and pages are precomputed at import, so have the reloader
+    # restart on template and static edits too, not just .py files
+    extra_files = [
+        os.path.join(root, name)
+        for folder in (app.static_folder, os.path.join(app.root_path, app.template_folder))
+        for root, _, files in os.walk(folder)
+        for name in files
+    ]
+    app.run(debug=debug, host='0.0.0.0', port=5000, extra_files=extra_files)
\ No newline at end of file
@@ -0,0 +1,624 @@
+"""End-to-end benchmark for ScholarAI.
+
+Boots app.py with Gemini replaced by a simulated upstream (configurable
+latency and injected 429s), then drives every endpoint at a fixed
+concurrency with realistic input sizes. Uploads use generated PDFs and
+Markdown files, and the documents workload feeds them back to every tool by
+document_id. The app runs either in-process on werkzeug's threaded server
+or under the production gunicorn.conf.py.
+
+    python benchmark.py --concurrency 32 --requests 100 --output results.json
+    python benchmark.py --server gunicorn --workers 2
+    python benchmark.py --compare results.json
+
+Reports throughput, p50/p95/p99 latency, upstream calls (quota used), 429s
+and extra upstream calls per endpoint, and saves the results as JSON so runs
+can be compared across versions. No API key or network access is needed.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import google.generativeai as genai
+from werkzeug.serving import make_server
+
+
+WORDS = (
+    "the process data system student learns photosynthesis energy cell "
+    "algorithm input output value network memory model theory history "
+    "economy market chapter concept example result analysis method light "
+    "structure function research evidence experiment variable equation"
+).split()
+
+ENDPOINTS = ['pages', 'summarize', 'quiz', 'flowchart', 'upload', 'documents']
+
+PAGE_ROUTES = ['/', '/summarize', '/quiz', '/flowchart']
+
+# Endpoint -> (min chars, max chars, median chars) - limits mirror app.py
+INPUT_SIZES = {
+    'summarize': (100, 30000, 2500),
+    'quiz': (100, 20000, 2000),
+    'flowchart': (50, 15000, 600),
+}
+
+# Share of uploads that repeat an earlier file, to exercise the hash cache
+UPLOAD_REPEAT_RATE = 0.2
+PDF_CHARS_PER_PAGE = 3000
+
+Upload = namedtuple('Upload', 'filename content_type data')
+
+# Forced on the app in both server modes, so runs always measure the
+# production paths (no debug mode, precomputed assets and pages) whatever
+# the repo's .env says
+APP_ENV = {
+    'FLASK_DEBUG': '0',
+    'SCHOLARAI_PRECOMPUTE_ASSETS': '1',
+}
+
+
+# SIMULATED UPSTREAM
+
+class UpstreamStats:
+    """Counters for calls made to the simulated Gemini API.
+
+    Kept in shared memory so that forked gunicorn workers all add to the
+    same totals.
+    """
+
+    def __init__(self):
+        self.counts = multiprocessing.Array('q', 2)
+
+    def record(self, throttled):
+        with self.counts.get_lock():
+            self.counts[0] += 1
+            if throttled:
+                self.counts[1] += 1
+
+    def snapshot(self):
+        with self.counts.get_lock():
+            return self.counts[0], self.counts[1]
+
+
+class RemoteStats:
+    """Reads UpstreamStats from a server process through /_bench/upstream"""
+
+    def __init__(self, base_url):
+        self.url = base_url + '/_bench/upstream'
+
+    def snapshot(self):
+        with urllib.request.urlopen(self.url, timeout=10) as resp:
+            data = json.load(resp)
+        return data['calls'], data['throttled']
+
+
+class SimulatedResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def make_simulated_model(stats, latency_ms, latency_sigma, error_rate, seed):
+    """Build a stand-in for genai.GenerativeModel with injected latency and 429s"""
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class SimulatedModel:
+        def __init__(self, model_name, *args, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, generation_config=None, **kwargs):
+            with rng_lock:
+                delay = latency_ms * math.exp(rng.gauss(0, latency_sigma)) / 1000
+                throttled = rng.random() < error_rate
+
+            stats.record(throttled)
+            time.sleep(delay)
+
+            if throttled:
+                raise Exception("429 Resource has been exhausted (e.g. check quota).")
+
+            return SimulatedResponse(simulated_text(prompt))
+
+    return SimulatedModel
+
+
+def simulated_text(prompt):
+    """Return a plausible response for whichever ScholarAI prompt was sent"""
+    if 'multiple choice questions' in prompt:
+        match = re.search(r'Generate (\d+) multiple choice', prompt)
+        count = int(match.group(1)) if match else 5
+        questions = [{
+            'question': f'Sample question {i + 1}?',
+            'options': {'A': 'First', 'B': 'Second', 'C': 'Third', 'D': 'Fourth'},
+            'correct': 'A',
+            'explanation': 'Simulated explanation.'
+        } for i in range(count)]
+        return '```json\n' + json.dumps({'questions': questions}) + '\n```'
+
+    if 'Graphviz DOT' in prompt:
+        match = re.search(r'rankdir=(\w+);', prompt)
+        rankdir = match.group(1) if match else 'TB'
+        return f"""```dot
+digraph G {{
+    rankdir={rankdir};
+    start [label="Start", shape=ellipse, style=filled, fillcolor="#87CEEB"];
+    step1 [label="Read input", shape=box, style=filled, fillcolor="#90EE90"];
+    check [label="Valid?", shape=diamond, style=filled, fillcolor="#FFD700"];
+    end [label="End", shape=ellipse, style=filled, fillcolor="#FFA07A"];
+    start -> step1;
+    step1 -> check;
+    check -> end [label="Yes"];
+    check -> step1 [label="No"];
+}}
+```"""
+
+    return "### Main Concepts\n" + "**Summary** of the provided text. " * 40
+
+
+def load_app(stats, latency_ms, latency_sigma, error_rate, seed):
+    """Import app.py with the simulated upstream swapped in for Gemini"""
+    os.environ.update(APP_ENV)
+    os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+    os.environ.setdefault('FLOWCHART_CACHE_DIR', tempfile.mkdtemp(prefix='scholarai-bench-'))
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = make_simulated_model(stats, latency_ms, latency_sigma, error_rate, seed)
+
+    # Model probing at import may hit a simulated 429 - retry like a restart would
+    for _ in range(5):
+        try:
+            from app import app
+            break
+        except Exception as e:
+            sys.modules.pop('app', None)
+            print(f"⚠️  App startup failed ({str(e)[:50]}), retrying...")
+    else:
+        raise RuntimeError("Could not start app with the simulated upstream")
+
+    @app.route('/_bench/upstream')
+    def bench_upstream():
+        calls, throttled = stats.snapshot()
+        return {'calls': calls, 'throttled': throttled}
+
+    return app
+
+
+def simulated_app():
+    """Gunicorn entry point: app.py on the simulated upstream set by BENCH_* env vars"""
+    return load_app(
+        UpstreamStats(),
+        float(os.environ['BENCH_LATENCY_MS']),
+        float(os.environ['BENCH_LATENCY_SIGMA']),
+        float(os.environ['BENCH_ERROR_RATE']),
+        int(os.environ['BENCH_SEED'])
+    )
+
+
+# WORKLOAD
+
+def sample_text(rng, endpoint):
+    """Draw an input from a log-normal size distribution clipped to the endpoint limits"""
+    low, high, median = INPUT_SIZES[endpoint]
+    size = int(median * math.exp(rng.gauss(0, 0.9)))
+    return random_words(rng, max(low, min(high, size)))
+
+
+def random_words(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def make_pdf(pages):
+    """Build a minimal text-only PDF with one page per string"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>']
+    kids = ' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))
+    objects.append(f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode())
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    for i, text in enumerate(pages):
+        lines = [text[j:j + 90] for j in range(0, len(text), 90)]
+        escaped = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in lines]
+        stream = 'BT /F1 9 Tf 30 760 Td 11 TL ' + ' '.join(f'({line}) Tj T*' for line in escaped) + ' ET'
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'.encode()
+        )
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream'.encode())
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + obj + b'\nendobj\n'
+
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        out += f'{offset:010d} 00000 n \n'.encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(out)
+
+
+def build_upload_requests(count, rng):
+    """Alternate small multi-page PDFs and text files, repeating some for cache hits"""
+    specs = []
+    for i in range(count):
+        if specs and rng.random() < UPLOAD_REPEAT_RATE:
+            specs.append(rng.choice(specs))
+        elif i % 2 == 0:
+            pages = [random_words(rng, PDF_CHARS_PER_PAGE) for _ in range(rng.randint(1, 40))]
+            upload = Upload(f'notes-{i}.pdf', 'application/pdf', make_pdf(pages))
+            specs.append(('POST', '/upload', upload, len(upload.data)))
+        else:
+            text = random_words(rng, int(5000 * math.exp(rng.gauss(0, 1.0))) + 100)
+            upload = Upload(f'notes-{i}.md', 'text/markdown', text.encode('utf-8'))
+            specs.append(('POST', '/upload', upload, len(upload.data)))
+    return specs
+
+
+def build_document_requests(count, rng, document_ids):
+    """Feed uploaded documents to every tool by document_id"""
+    specs = []
+    for i in range(count):
+        document_id = rng.choice(document_ids)
+        tool = ('summarize', 'quiz', 'flowchart')[i % 3]
+        if tool == 'summarize':
+            specs.append(('POST', '/summarize', {'document_id': document_id}, 0))
+        elif tool == 'quiz':
+            body = {'document_id': document_id, 'num_questions': rng.randint(3, 15)}
+            specs.append(('POST', '/generate-quiz', body, 0))
+        else:
+            specs.append(('POST', '/generate-flowchart', {'document_id': document_id}, 0))
+    return specs
+
+
+def build_requests(endpoint, count, rng):
+    """Return (method, path, body, input size) tuples for one endpoint"""
+    if endpoint == 'pages':
+        return [('GET', PAGE_ROUTES[i % len(PAGE_ROUTES)], None, 0) for i in range(count)]
+
+    if endpoint == 'upload':
+        return build_upload_requests(count, rng)
+
+    specs = []
+    for _ in range(count):
+        text = sample_text(rng, endpoint)
+        if endpoint == 'summarize':
+            specs.append(('POST', '/summarize', {'text': text}, len(text)))
+        elif endpoint == 'quiz':
+            body = {
+                'text': text,
+                'num_questions': rng.randint(3, 15),
+                'difficulty': rng.choice(['easy', 'medium', 'hard'])
+            }
+            specs.append(('POST', '/generate-quiz', body, len(text)))
+        else:
+            body = {'text': text, 'chart_style': rng.choice(['TB', 'LR', 'BT', 'RL'])}
+            specs.append(('POST', '/generate-flowchart', body, len(text)))
+    return specs
+
+
+def encode_multipart(upload):
+    """Return (content type, body) for a single 'file' form field"""
+    boundary = uuid.uuid4().hex
+    head = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="file"; filename="{upload.filename}"\r\n'
+        f'Content-Type: {upload.content_type}\r\n\r\n'
+    ).encode('utf-8')
+    tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return f'multipart/form-data; boundary={boundary}', head + upload.data + tail
+
+
+def send(base_url, spec, timeout):
+    """Issue one request and return (status, latency seconds, response body)"""
+    method, path, body, _ = spec
+    content_type = None
+    if isinstance(body, Upload):
+        content_type, data = encode_multipart(body)
+    elif body is not None:
+        content_type, data = 'application/json', json.dumps(body).encode('utf-8')
+    else:
+        data = None
+
+    req = urllib.request.Request(base_url + path, data=data, method=method)
+    if content_type:
+        req.add_header('Content-Type', content_type)
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            payload = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        payload = e.read()
+        status = e.code
+    except Exception:
+        payload = b''
+        status = 0
+    return status, time.perf_counter() - start, payload
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def run_endpoint(base_url, endpoint, specs, concurrency, timeout, stats):
+    """Run one workload; return (summary, [(status, body), ...])"""
+    calls_before, throttled_before = stats.snapshot()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda spec: send(base_url, spec, timeout), specs))
+    elapsed = time.perf_counter() - start
+
+    calls_after, throttled_after = stats.snapshot()
+    upstream_calls = calls_after - calls_before
+
+    latencies = sorted(latency for _, latency, _ in results)
+    statuses = {}
+    for status, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    ok = sum(count for status, count in statuses.items() if status.startswith('2'))
+    input_chars = [spec[3] for spec in specs]
+
+    summary = {
+        'requests': len(specs),
+        'ok': ok,
+        'errors': len(specs) - ok,
+        'status_codes': statuses,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(specs) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 1),
+            'p50': round(percentile(latencies, 50) * 1000, 1),
+            'p95': round(percentile(latencies, 95) * 1000, 1),
+            'p99': round(percentile(latencies, 99) * 1000, 1),
+            'max': round(latencies[-1] * 1000, 1),
+        },
+        'input_size_mean': round(sum(input_chars) / len(input_chars)) if input_chars else 0,
+        'upstream_calls': upstream_calls,
+        'upstream_429s': throttled_after - throttled_before,
+        # Every upstream call beyond one per request: 429 backoff retries, but
+        # also retries on unparseable output and flowchart DOT-repair calls
+        'extra_upstream_calls': max(0, upstream_calls - len(specs)) if endpoint not in ('pages', 'upload') else 0,
+    }
+    return summary, [(status, body) for status, _, body in results]
+
+
+def document_ids_from(responses):
+    ids = set()
+    for status, body in responses:
+        if status == 200:
+            try:
+                ids.add(json.loads(body)['document_id'])
+            except (ValueError, KeyError):
+                pass
+    return sorted(ids)
+
+
+# SERVERS
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(args):
+    """Run gunicorn.conf.py with simulated_app() and wait until it answers"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+
+    env = dict(os.environ)
+    env.update(APP_ENV)
+    env.update({
+        'BENCH_LATENCY_MS': str(args.latency_ms),
+        'BENCH_LATENCY_SIGMA': str(args.latency_sigma),
+        'BENCH_ERROR_RATE': str(args.error_rate),
+        'BENCH_SEED': str(args.seed),
+        'BIND': f'127.0.0.1:{port}',
+        'GEMINI_API_KEY': env.get('GEMINI_API_KEY', 'benchmark'),
+        'FLOWCHART_CACHE_DIR': tempfile.mkdtemp(prefix='scholarai-bench-'),
+        'UPLOAD_DIR': tempfile.mkdtemp(prefix='scholarai-bench-uploads-'),
+    })
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+
+    log_path = os.path.join(tempfile.mkdtemp(prefix='scholarai-bench-log-'), 'gunicorn.log')
+    log = open(log_path, 'w')
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'benchmark:simulated_app()'],
+        cwd=root, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+    stats = RemoteStats(base_url)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            break
+        try:
+            stats.snapshot()
+            return proc, base_url, stats, log_path
+        except Exception:
+            time.sleep(0.5)
+
+    proc.kill()
+    raise RuntimeError(f"gunicorn did not start, see {log_path}")
+
+
+def stop_gunicorn(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=90)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# REPORTING
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def print_report(results):
+    print("\n" + "=" * 100)
+    print(f"{'endpoint':<12}{'reqs':>6}{'ok':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'upstream':>10}{'429s':>7}{'extra':>9}")
+    print("-" * 100)
+    for endpoint, r in results['endpoints'].items():
+        lat = r['latency_ms']
+        print(f"{endpoint:<12}{r['requests']:>6}{r['ok']:>6}{r['throughput_rps']:>9}"
+              f"{lat['p50']:>10}{lat['p95']:>10}{lat['p99']:>10}"
+              f"{r['upstream_calls']:>10}{r['upstream_429s']:>7}{r['extra_upstream_calls']:>9}")
+    print("=" * 100)
+
+
+def compare(results, baseline, threshold):
+    """Print p95/throughput deltas against a saved run; return True on regression"""
+    print(f"\n📊 Compared with revision {baseline.get('revision')} from {baseline.get('timestamp')}")
+    if baseline.get('server') != results['server']:
+        print(f"  ⚠️  Baseline ran on {baseline.get('server', 'werkzeug')}, this run on {results['server']}")
+    regressed = False
+    for endpoint, r in results['endpoints'].items():
+        old = baseline.get('endpoints', {}).get(endpoint)
+        if not old:
+            continue
+        p95_change = (r['latency_ms']['p95'] - old['latency_ms']['p95']) / max(old['latency_ms']['p95'], 0.001)
+        rps_change = (r['throughput_rps'] - old['throughput_rps']) / max(old['throughput_rps'], 0.001)
+        flag = p95_change > threshold or rps_change < -threshold
+        regressed = regressed or flag
+        print(f"  {'⚠️ ' if flag else '✓ '} {endpoint:<12} p95 {p95_change:+.1%}   throughput {rps_change:+.1%}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ScholarAI against a simulated Gemini upstream")
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                        help=f"Comma-separated list of: {', '.join(ENDPOINTS)} "
+                             "(documents reuses files from the upload run)")
+    parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients')
+    parser.add_argument('--latency-ms', type=float, default=800, help='Median simulated Gemini latency')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Log-normal spread of the latency')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Fraction of Gemini calls that return 429')
+    parser.add_argument('--timeout', type=float, default=120, help='Client timeout per request in seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--server', choices=['werkzeug', 'gunicorn'], default='werkzeug',
+                        help='In-process threaded werkzeug server, or gunicorn with gunicorn.conf.py')
+    parser.add_argument('--workers', type=int, help='gunicorn worker count (default from gunicorn.conf.py)')
+    parser.add_argument('--output', default='bench_results.json', help='Where to save the JSON results')
+    parser.add_argument('--compare', help='Previous results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative p95/throughput change counted as a regression')
+    args = parser.parse_args()
+
+    # Read the baseline up front - it may be the same file as --output
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    endpoints = [e.strip() for e in args.endpoints.split(',') if e.strip()]
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    try:
+        if args.server == 'gunicorn':
+            proc, base_url, stats, log_path = start_gunicorn(args)
+            stop_server = lambda: stop_gunicorn(proc)
+        else:
+            stats = UpstreamStats()
+            os.environ['UPLOAD_DIR'] = tempfile.mkdtemp(prefix='scholarai-bench-uploads-')
+            app = load_app(stats, args.latency_ms, args.latency_sigma, args.error_rate, args.seed)
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f'http://127.0.0.1:{server.server_port}'
+            stop_server = server.shutdown
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("\n" + "=" * 70)
+    print("⏱️  ScholarAI Benchmark")
+    print("=" * 70)
+    print(f"✓ Server: {args.server} at {base_url}")
+    if args.server == 'gunicorn':
+        print(f"✓ Server log: {log_path}")
+    print(f"✓ Concurrency: {args.concurrency}, requests per endpoint: {args.requests}")
+    print(f"✓ Upstream: {args.latency_ms:.0f}ms median latency, {args.error_rate:.0%} 429s")
+    print("=" * 70)
+
+    rng = random.Random(args.seed)
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'server': args.server,
+        'config': dict(vars(args), app_env=APP_ENV),
+        'endpoints': {},
+    }
+
+    document_ids = []
+    try:
+        for endpoint in endpoints:
+            if endpoint == 'documents':
+                if not document_ids:
+                    print("⚠️  Skipping documents - run it after a successful upload workload")
+                    continue
+                specs = build_document_requests(args.requests, rng, document_ids)
+            else:
+                specs = build_requests(endpoint, args.requests, rng)
+
+            print(f"🚀 Running {endpoint}...")
+            summary, responses = run_endpoint(
+                base_url, endpoint, specs, args.concurrency, args.timeout, stats
+            )
+            results['endpoints'][endpoint] = summary
+            if endpoint == 'upload':
+                document_ids = document_ids_from(responses)
+    finally:
+        stop_server()
+
+    print_report(results)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {args.output}")
+
+    if baseline and compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Gunicorn settings for running ScholarAI in production.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Every worker is a gevent process: each pending Gemini call is a greenlet
+parked on a socket instead of a blocked OS thread, so one process can keep
+hundreds of slow generations in flight. All settings can be overridden
+through environment variables.
+"""
+import os
+
+WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+
+# Patch sockets, ssl, time.sleep and threading before the app (and the
+# Gemini client) is preloaded below, so all LLM I/O becomes cooperative
+if WORKER_CLASS == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+import multiprocessing
+import sys
+
+# Never run the preloaded app in debug mode, whatever .env says -
+# load_dotenv() in app.py does not override variables that are already set
+os.environ['FLASK_DEBUG'] = '0'
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# gevent workers are I/O bound, so one per core is enough; the sync/gthread
+# fallback needs the usual 2 * cores + 1
+worker_class = WORKER_CLASS
+default_workers = multiprocessing.cpu_count()
+if worker_class != 'gevent':
+    default_workers = default_workers * 2 + 1
+workers = int(os.getenv('WEB_CONCURRENCY', default_workers))
+
+# Open connections per gevent worker; in-flight Gemini calls are capped
+# separately by LLM_MAX_CONCURRENCY in app.py
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', '1000'))
+
+# Only used by the gthread worker class
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Load app.py (and pick a working Gemini model) once in the master
+# instead of probing the API again in every worker
+preload_app = True
+
+# Flowchart generation can retry up to 5 times with backoff, so allow slow
+# requests and give in-flight ones time to finish on shutdown/reload
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '180'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '60'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '500'))
+
+
+
+def post_fork(server, worker):
+    """Give each worker its own Gemini client.
+
+    app.py probes Gemini at import, so with preload_app the master already
+    holds the REST client's keep-alive HTTPS connection. Workers must not
+    share that socket and TLS state, so reconfigure genai and rebuild the
+    model; each worker then opens its own connection on its first call.
+    """
+    scholarai = sys.modules.get('app')
+    if scholarai is None or scholarai.model is None:
+        return
+
+    import google.generativeai as genai
+    genai.configure(api_key=scholarai.GEMINI_API_KEY, transport=scholarai.GEMINI_TRANSPORT)
+    scholarai.model = genai.GenerativeModel(scholarai.MODEL_NAME)
+
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
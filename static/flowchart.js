@@ -21,8 +21,8 @@ document.addEventListener("DOMContentLoaded", () => {
   const newFlowchartBtn = document.getElementById("new-flowchart-btn");
   
   let currentDotCode = '';
-  let currentSvgData = '';
-  let currentPngBase64 = '';
+  let currentSvgUrl = '';
+  let currentPngUrl = '';
   
   
   // Example tag clicks
@@ -100,10 +100,15 @@ document.addEventListener("DOMContentLoaded", () => {
       
       if (response.ok && data.success) {
         currentDotCode = data.dot_code;
-        currentSvgData = data.svg_data;
-        currentPngBase64 = data.png_base64;
+        currentSvgUrl = data.svg_url;
+        currentPngUrl = data.png_url;
         
-        displayFlowchart(currentSvgData);
+        // SVG is served separately so the browser can cache it
+        const svgResponse = await fetch(currentSvgUrl);
+        if (!svgResponse.ok) {
+          throw new Error('Failed to load flowchart image');
+        }
+        displayFlowchart(await svgResponse.text());
         dotCode.textContent = currentDotCode;
         
         showDisplaySection();
@@ -178,43 +183,50 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
   
-  function downloadPNG() {
-    if (!currentPngBase64) {
+  async function downloadPNG() {
+    if (!currentPngUrl) {
       alert('No flowchart to download');
       return;
     }
     
     try {
+      // The PNG is rendered on first request, so check for a JSON error
+      // before saving the body
+      const response = await fetch(currentPngUrl);
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw new Error(data.error || 'PNG rendering failed');
+      }
+      
+      const url = URL.createObjectURL(await response.blob());
       const link = document.createElement('a');
-      link.href = 'data:image/png;base64,' + currentPngBase64;
+      link.href = url;
       link.download = 'scholarai-flowchart.png';
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
+      URL.revokeObjectURL(url);
       
       console.log('✅ PNG downloaded');
     } catch (error) {
       console.error('Download error:', error);
-      alert('Error downloading PNG. Please try again.');
+      alert('Error downloading PNG: ' + error.message);
     }
   }
   
   function downloadSVG() {
-    if (!currentSvgData) {
+    if (!currentSvgUrl) {
       alert('No flowchart to download');
       return;
     }
     
     try {
-      const blob = new Blob([currentSvgData], { type: 'image/svg+xml' });
-      const url = URL.createObjectURL(blob);
       const link = document.createElement('a');
-      link.href = url;
+      link.href = currentSvgUrl;
       link.download = 'scholarai-flowchart.svg';
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
-      URL.revokeObjectURL(url);
       
       console.log('✅ SVG downloaded');
     } catch (error) {